@@ -1,21 +1,51 @@
-from flask import Flask, request, jsonify
+from quart import Quart, request
 import logging
+import logging.handlers
+import queue
+import atexit
 import os
 import sys
-from datetime import datetime
 import asyncio
+import functools
+import collections
+import time
+import types
 import websockets
 import json
-import threading
+import orjson
 import socket
+import uvicorn
 
-# 初始化 Flask 应用
-app = Flask(__name__)
+# 初始化 Quart 应用（ASGI，HTTP与WebSocket服务器共用同一个事件循环）
+app = Quart(__name__)
+
+# 调试模式默认关闭，需要时设置环境变量 QUART_DEBUG=1
+DEBUG = os.getenv('QUART_DEBUG', '0') == '1'
+app.debug = DEBUG
+
+# webhook 响应统一使用 orjson 序列化
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# 成功响应内容固定，启动时构建一次，每个请求直接复用
+# （应用未注册 after_request 和 session，响应对象不会被按请求修改）
+_SUCCESS_RESPONSE = app.response_class(
+    orjson.dumps({"status": "success", "message": "Signal received"}),
+    status=200,
+    mimetype='application/json'
+)
 
 # WebSocket配置
 WS_HOST = os.getenv('WS_HOST', '0.0.0.0')
 WS_PORT = int(os.getenv('WS_PORT', 9528))
 WS_ENABLED = os.getenv('WS_ENABLED', 'true').lower() == 'true'
+WS_CLIENT_QUEUE_SIZE = int(os.getenv('WS_CLIENT_QUEUE_SIZE', 1000))  # 每个客户端待发送消息队列上限
+WS_BROADCAST_CHUNK_SIZE = 50  # 每向多少个客户端入队后让出一次事件循环
+WS_SHUTDOWN_DRAIN_TIMEOUT = 1.0  # 关闭服务器前等待待发送信号发出的最长秒数
+WS_BATCH_WINDOW = float(os.getenv('WS_BATCH_WINDOW_MS', 5)) / 1000  # 合并突发信号的时间窗口，0 表示不合并
+
+# 重复信号过滤配置（TradingView 网络抖动时会重试推送同一信号）
+SIGNAL_DEDUP_WINDOW = float(os.getenv('SIGNAL_DEDUP_WINDOW', 2.0))  # 相同信号在该秒数内只广播一次，0 表示不过滤
+SIGNAL_DEDUP_MAX_ENTRIES = 256  # 记录的最近信号数量上限
 
 # 品种转发映射配置
 # 配置文件路径：ticker_mapping.txt（与app.py同目录）
@@ -29,7 +59,9 @@ _default_ticker_mapping = {
     # 可以在这里添加更多默认映射
 }
 
-_ticker_mapping = _default_ticker_mapping.copy()
+# 对外发布只读快照，重新加载时整体替换引用，读取方不会看到更新到一半的映射表
+_ticker_mapping = types.MappingProxyType(dict(_default_ticker_mapping))
+_config_cache = {'mtime': None, 'mapping': None}  # 配置文件解析结果缓存，文件修改时间不变时无需重新解析
 
 # 获取应用根目录（支持PyInstaller打包后的EXE）
 def get_app_dir():
@@ -48,18 +80,28 @@ _config_file_path = os.path.join(_app_dir, 'ticker_mapping.txt')
 log_dir = os.path.join(_app_dir, 'logs')
 os.makedirs(log_dir, exist_ok=True)
 
-# 日志文件名包含日期
-log_filename = os.path.join(log_dir, f'webhook_{datetime.now().strftime("%Y%m%d")}.log')
+# 日志每天午夜自动切分，历史文件名为 webhook.log.YYYY-MM-DD（长时间运行也不会一直写入同一天的文件）
+log_filename = os.path.join(log_dir, 'webhook.log')
 
 # 配置日志格式
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+_file_handler = logging.handlers.TimedRotatingFileHandler(log_filename, when='midnight', encoding='utf-8', utc=False)
+_file_handler.setFormatter(_log_formatter)
+_console_handler = logging.StreamHandler()  # 同时输出到控制台
+_console_handler.setFormatter(_log_formatter)
+
+# 请求处理中只把日志放入队列，文件和控制台写入由后台线程完成
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _file_handler, _console_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # 最终格式由后台处理器负责
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler(log_filename, encoding='utf-8'),
-        logging.StreamHandler()  # 同时输出到控制台
-    ]
+    handlers=[_queue_handler]
 )
 
 logger = logging.getLogger(__name__)
@@ -72,37 +114,46 @@ def load_ticker_mapping():
     """
     global _ticker_mapping
     
-    # 先使用默认配置
-    _ticker_mapping = _default_ticker_mapping.copy()
+    # 先使用默认配置（在局部字典中合并，最后一次性发布）
+    mapping = dict(_default_ticker_mapping)
     
     # 尝试从配置文件加载
     file_mapping = {}
     if os.path.exists(_config_file_path):
         try:
-            with open(_config_file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    # 跳过空行和注释行
-                    if not line or line.startswith('#'):
-                        continue
+            mtime = os.stat(_config_file_path).st_mtime
+            if mtime == _config_cache['mtime']:
+                # 文件未修改，直接复用上次的解析结果
+                file_mapping = _config_cache['mapping']
+                logger.info("配置文件未修改，沿用已解析的品种映射")
+            else:
+                with open(_config_file_path, 'r', encoding='utf-8') as f:
+                    for line_num, line in enumerate(f, 1):
+                        line = line.strip()
+                        # 跳过空行和注释行
+                        if not line or line.startswith('#'):
+                            continue
                     
-                    # 解析 "源品种=目标品种" 格式
-                    if '=' in line:
-                        parts = line.split('=', 1)
-                        if len(parts) == 2:
-                            source = parts[0].strip().upper()
-                            target = parts[1].strip()
-                            if source and target:
-                                file_mapping[source] = target
+                        # 解析 "源品种=目标品种" 格式
+                        if '=' in line:
+                            parts = line.split('=', 1)
+                            if len(parts) == 2:
+                                source = parts[0].strip().upper()
+                                target = parts[1].strip()
+                                if source and target:
+                                    file_mapping[source] = target
+                                else:
+                                    logger.warning(f"配置文件第{line_num}行格式错误，已跳过: {line}")
                             else:
                                 logger.warning(f"配置文件第{line_num}行格式错误，已跳过: {line}")
                         else:
-                            logger.warning(f"配置文件第{line_num}行格式错误，已跳过: {line}")
-                    else:
-                        logger.warning(f"配置文件第{line_num}行格式错误（缺少=），已跳过: {line}")
+                            logger.warning(f"配置文件第{line_num}行格式错误（缺少=），已跳过: {line}")
+                
+                _config_cache['mtime'] = mtime
+                _config_cache['mapping'] = file_mapping
             
             if file_mapping:
-                _ticker_mapping.update(file_mapping)  # 文件配置覆盖默认配置
+                mapping.update(file_mapping)  # 文件配置覆盖默认配置
                 logger.info(f"已从配置文件加载品种映射: {file_mapping}")
             else:
                 logger.info(f"配置文件 {_config_file_path} 存在但为空，使用默认配置")
@@ -116,47 +167,103 @@ def load_ticker_mapping():
     if env_mapping_str:
         try:
             env_mapping = json.loads(env_mapping_str)
-            _ticker_mapping.update(env_mapping)  # 环境变量覆盖文件配置
+            mapping.update(env_mapping)  # 环境变量覆盖文件配置
             logger.info(f"已从环境变量加载品种映射: {env_mapping}")
         except json.JSONDecodeError as e:
             logger.error(f"解析环境变量品种映射配置失败: {e}，忽略环境变量配置")
     
-    logger.info(f"最终品种映射配置: {_ticker_mapping}")
+    # 加载时统一转为大写键，查询时无需再处理键的大小写
+    merged = {str(source).upper(): target for source, target in mapping.items()}
+    _ticker_mapping = types.MappingProxyType(merged)
+    
+    # 映射表已变化，清空映射结果缓存
+    _map_ticker_cached.cache_clear()
+    logger.info(f"最终品种映射配置: {merged}")
 
-def map_ticker(ticker):
+@functools.lru_cache(maxsize=256)
+def _map_ticker_cached(ticker):
     """
-    根据配置映射品种名称
-    如果ticker在映射表中，返回映射后的名称；否则返回原名称
+    缓存品种映射结果（品种数量少且固定，命中后只需一次缓存查找）
+    只在缓存未命中时执行，因此映射日志对每个品种只记录一次
     """
-    if not ticker or ticker == '未知品种':
-        return ticker
-    
     # 转换为大写进行匹配（不区分大小写）
-    ticker_upper = ticker.upper()
-    mapped_ticker = _ticker_mapping.get(ticker_upper, ticker)
+    mapped_ticker = _ticker_mapping.get(ticker.upper(), ticker)
     
     if mapped_ticker != ticker:
         logger.info(f"品种映射: {ticker} -> {mapped_ticker}")
     
     return mapped_ticker
 
+def map_ticker(ticker):
+    """
+    根据配置映射品种名称
+    如果ticker在映射表中，返回映射后的名称；否则返回原名称
+    """
+    if not ticker or ticker == '未知品种':
+        return ticker
+    
+    return _map_ticker_cached(ticker)
+
 # WebSocket服务器连接池（存储所有连接的ATAS客户端）
+# 只在事件循环线程中访问，asyncio 单线程调度保证修改不会交错，无需加锁
 _ws_clients = set()
-_ws_lock = threading.Lock()
 _ws_server = None
 _ws_server_started = False  # 防止重复启动
-_broadcast_loop = None  # 复用的事件循环，避免每次创建
-_broadcast_loop_thread = None
+_pending_signals = []  # 时间窗口内等待合并广播的信号
+_flush_handle = None  # 已安排的合并广播回调
+_broadcast_lock = asyncio.Lock()  # 保证多次广播按顺序逐个完成
+_background_tasks = set()  # 持有后台任务（广播、关闭连接）的引用，防止被提前回收
+
+def _create_background_task(coro):
+    """
+    创建后台任务并保存引用，任务结束后自动移除
+    """
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+def _on_background_task_done(task):
+    """
+    后台任务结束：移除引用，并记录未处理的异常（否则只会在任务回收时打印一条不明显的警告）
+    """
+    _background_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error(f"后台任务执行失败: {exc}", exc_info=exc)
+
+async def _client_writer(websocket):
+    """
+    客户端发送协程：依次取出该客户端队列中的消息并发送
+    慢客户端只会阻塞自己的队列，不影响广播和其他客户端
+    """
+    out_queue = websocket.out_queue
+    try:
+        while True:
+            # 队列中每一项是一批已序列化的消息，连续发送，每条信号仍是一个独立的Text帧
+            batch = await out_queue.get()
+            for message in batch:
+                await websocket.send(message)
+            out_queue.task_done()
+    except websockets.ConnectionClosed:
+        pass
+    except Exception as e:
+        # 发送协程已退出，不能继续给该连接排队消息；移出连接池并关闭，由客户端自行重连
+        logger.warning(f"向客户端发送失败，将断开连接: {e}")
+        _ws_clients.discard(websocket)
+        await websocket.close(code=1011, reason='send failed')
 
 async def register_client(websocket):
     """
     注册WebSocket客户端连接
     兼容新版本 websockets 库（不需要 path 参数）
     """
-    global _ws_clients
     logger.info(f"新的WebSocket客户端已连接: {websocket.remote_address}")
-    with _ws_lock:
-        _ws_clients.add(websocket)
+    websocket.out_queue = asyncio.Queue(maxsize=WS_CLIENT_QUEUE_SIZE)
+    writer_task = asyncio.create_task(_client_writer(websocket))
+    _ws_clients.add(websocket)
     
     try:
         # 保持连接，等待客户端断开
@@ -164,91 +271,88 @@ async def register_client(websocket):
     except Exception as e:
         logger.error(f"WebSocket客户端连接错误: {e}")
     finally:
-        with _ws_lock:
-            _ws_clients.discard(websocket)
+        _ws_clients.discard(websocket)
+        writer_task.cancel()
         logger.info("WebSocket客户端已断开")
 
-async def broadcast_signal(signal_data):
+async def broadcast_signals(signal_batch):
     """
-    向所有连接的WebSocket客户端广播信号
+    向所有连接的WebSocket客户端广播一批信号
+    只把消息放入各客户端的发送队列，由各自的发送协程完成网络IO
     """
-    global _ws_clients
-    if not WS_ENABLED:
+    if not WS_ENABLED or not _ws_clients:
         return
     
-    message = json.dumps(signal_data, ensure_ascii=False)
-    disconnected = set()
-    
-    # 复制客户端列表，减少锁持有时间
-    clients_copy = None
-    with _ws_lock:
-        if len(_ws_clients) == 0:
-            return
-        clients_copy = list(_ws_clients)
-    
-    # 在锁外进行网络IO操作，提高并发性能
-    for client in clients_copy:
+    # 每个信号只序列化一次（orjson 直接输出UTF-8，不转义中文，等价于 ensure_ascii=False）
+    # ATAS端只处理Text帧且每帧解析一个信号对象，因此每批只解码一次为str供所有客户端共用，不合并成JSON数组
+    # （send(str) 仍会为每个客户端做一次UTF-8编码；直接写预编码帧依赖 websockets 内部接口，不值得）
+    # 逐条序列化，单条信号无法序列化时只跳过该条，不影响同一批中的其他信号
+    encoded = []
+    for signal_data in signal_batch:
         try:
-            await client.send(message)
-        except Exception as e:
-            logger.warning(f"向客户端发送失败，将移除连接: {e}")
-            disconnected.add(client)
+            encoded.append(orjson.dumps(signal_data).decode('utf-8'))
+        except orjson.JSONEncodeError as e:
+            logger.error(f"信号序列化失败，已跳过: {signal_data}，原因: {e}")
+    if not encoded:
+        return
+    messages = tuple(encoded)
+    disconnected = set()
     
-    # 移除断开的连接
-    if disconnected:
-        with _ws_lock:
-            _ws_clients -= disconnected
+    # 分块入队之间会让出事件循环，用锁保证广播逐个完成，
+    # 否则两次广播交错时客户端集合可能变化，同一客户端会乱序收到信号（Lock 按等待顺序唤醒，保持信号先后）
+    async with _broadcast_lock:
+        # 取快照遍历，关闭连接时会修改 _ws_clients
+        clients_copy = tuple(_ws_clients)
+        
+        # 客户端较多时分块入队，块之间让出事件循环，避免阻塞新的webhook、连接和心跳处理
+        for start in range(0, len(clients_copy), WS_BROADCAST_CHUNK_SIZE):
+            if start:
+                await asyncio.sleep(0)
+            for client in clients_copy[start:start + WS_BROADCAST_CHUNK_SIZE]:
+                try:
+                    client.out_queue.put_nowait(messages)
+                except asyncio.QueueFull:
+                    logger.warning(f"客户端 {client.remote_address} 发送队列已满，将断开连接")
+                    disconnected.add(client)
+        
+        # 移除积压过多的连接并关闭，由客户端自行重连
+        if disconnected:
+            _ws_clients.difference_update(disconnected)
+            for client in disconnected:
+                _create_background_task(client.close(code=1013, reason='send queue full'))
 
-def _init_broadcast_loop():
+def _flush_pending_signals():
     """
-    初始化并启动广播事件循环（在独立线程中运行）
+    时间窗口结束，把窗口内累积的信号作为一批广播
     """
-    global _broadcast_loop, _broadcast_loop_thread
-    
-    def run_loop():
-        global _broadcast_loop
-        _broadcast_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(_broadcast_loop)
-        _broadcast_loop.run_forever()
+    global _pending_signals, _flush_handle
+    _flush_handle = None
+    signal_batch, _pending_signals = _pending_signals, []
     
-    if _broadcast_loop_thread is None or not _broadcast_loop_thread.is_alive():
-        _broadcast_loop_thread = threading.Thread(target=run_loop, daemon=True)
-        _broadcast_loop_thread.start()
-        # 等待事件循环初始化
-        import time
-        time.sleep(0.1)
-
-def broadcast_signal_async(signal_data):
+    _create_background_task(broadcast_signals(signal_batch))
+
+async def queue_signal(signal_data):
     """
-    异步广播信号的包装函数
-    使用复用的事件循环，避免每次创建新循环的开销
+    把信号加入待广播列表
+    同一时间窗口内的突发信号合并为一批，每个客户端只入队一次
     """
-    global _broadcast_loop
-    
+    global _flush_handle
     if not WS_ENABLED:
         return
     
-    try:
-        # 确保事件循环已初始化
-        if _broadcast_loop is None:
-            _init_broadcast_loop()
-        
-        # 使用复用的事件循环提交任务
-        if _broadcast_loop is not None and _broadcast_loop.is_running():
-            asyncio.run_coroutine_threadsafe(broadcast_signal(signal_data), _broadcast_loop)
-        else:
-            # 降级方案：如果事件循环不可用，使用临时循环
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(broadcast_signal(signal_data))
-            loop.close()
-    except Exception as e:
-        logger.error(f"广播信号时出错: {e}")
+    if WS_BATCH_WINDOW <= 0:
+        await broadcast_signals((signal_data,))
+        return
+    
+    _pending_signals.append(signal_data)
+    if _flush_handle is None:
+        _flush_handle = asyncio.get_running_loop().call_later(WS_BATCH_WINDOW, _flush_pending_signals)
 
-def start_websocket_server():
+@app.before_serving
+async def start_websocket_server():
     """
     启动WebSocket服务器
-    防止在Flask重载器主进程中重复启动（重载器会启动子进程，只在子进程中启动一次）
+    在HTTP服务器启动前运行于同一个事件循环中，广播可以直接 await，无需跨线程投递
     """
     global _ws_server, _ws_server_started
     
@@ -261,43 +365,106 @@ def start_websocket_server():
         logger.info("WebSocket功能已禁用")
         return
     
-    async def server():
-        try:
-            async with websockets.serve(register_client, WS_HOST, WS_PORT):
-                logger.info(f"WebSocket服务器已启动，监听 {WS_HOST}:{WS_PORT}")
-                await asyncio.Future()  # 永久运行
-        except OSError as e:
-            if e.errno == 10048:  # Windows: 端口已被占用
-                logger.error(f"端口 {WS_PORT} 已被占用，请检查是否有其他程序在使用该端口，或修改 WS_PORT 环境变量")
-            else:
-                logger.error(f"启动WebSocket服务器失败: {e}")
-        except Exception as e:
-            logger.error(f"WebSocket服务器启动错误: {e}", exc_info=True)
+    try:
+        _ws_server = await websockets.serve(register_client, WS_HOST, WS_PORT)
+        _ws_server_started = True
+        logger.info(f"WebSocket服务器已启动，监听 {WS_HOST}:{WS_PORT}")
+    except OSError as e:
+        if e.errno == 10048:  # Windows: 端口已被占用
+            logger.error(f"端口 {WS_PORT} 已被占用，请检查是否有其他程序在使用该端口，或修改 WS_PORT 环境变量")
+        else:
+            logger.error(f"启动WebSocket服务器失败: {e}")
+    except Exception as e:
+        logger.error(f"WebSocket服务器启动错误: {e}", exc_info=True)
+
+@app.after_serving
+async def stop_websocket_server():
+    """
+    关闭WebSocket服务器
+    关闭前先发出合并窗口内尚未广播的信号，避免关闭时丢失
+    """
+    global _ws_server, _ws_server_started, _pending_signals, _flush_handle
+    
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+    signal_batch, _pending_signals = _pending_signals, []
+    
+    if _ws_server is None:
+        return
     
-    def run_server():
+    if signal_batch:
+        await broadcast_signals(signal_batch)
+        # 等待各客户端发送队列清空（最多等待 WS_SHUTDOWN_DRAIN_TIMEOUT 秒）
         try:
-            asyncio.run(server())
-        except Exception as e:
-            logger.error(f"WebSocket服务器线程错误: {e}", exc_info=True)
+            await asyncio.wait_for(
+                asyncio.gather(*(client.out_queue.join() for client in tuple(_ws_clients))),
+                timeout=WS_SHUTDOWN_DRAIN_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("关闭前部分客户端的待发送信号未能发送完成")
     
-    _ws_server_started = True
-    server_thread = threading.Thread(target=run_server, daemon=True)
-    server_thread.start()
-    logger.info("WebSocket服务器线程已启动")
+    _ws_server.close()
+    await _ws_server.wait_closed()
+    _ws_server = None
+    _ws_server_started = False
+    logger.info("WebSocket服务器已关闭")
+
+_UNKNOWN_VALUES = ('未知价格', '未知周期')
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 64 - 1  # orjson 只能序列化64位范围内的整数
+_recent_signals = collections.OrderedDict()  # 最近信号 -> 首次收到的时间（time.monotonic）
+
+def _is_duplicate_signal(signal_data):
+    """
+    判断是否为时间窗口内的重复信号，新信号会被记录
+    """
+    if SIGNAL_DEDUP_WINDOW <= 0:
+        return False
+    
+    key = (signal_data['Ticker'], signal_data['Action'], signal_data['Price'], signal_data['Interval'])
+    now = time.monotonic()
+    try:
+        last_seen = _recent_signals.get(key)
+    except TypeError:
+        # 字段不可哈希（非常规数据），不做过滤
+        return False
+    
+    if last_seen is not None and now - last_seen < SIGNAL_DEDUP_WINDOW:
+        return True
+    
+    _recent_signals[key] = now
+    _recent_signals.move_to_end(key)
+    if len(_recent_signals) > SIGNAL_DEDUP_MAX_ENTRIES:
+        _recent_signals.popitem(last=False)
+    return False
+
+def _to_num(value, cast):
+    """
+    把信号字段（数字或数字字符串）转换为数值
+    空值、占位值、无法转换或整数超出64位范围时返回None
+    """
+    if not value or value in _UNKNOWN_VALUES:
+        return None
+    try:
+        number = cast(value)
+    except (ValueError, TypeError):
+        return None
+    if cast is int and not _INT_MIN <= number <= _INT_MAX:
+        return None
+    return number
 
 @app.route('/webhook', methods=['POST'])
-def webhook_listener():
+async def webhook_listener():
     """
     这是接收 TradingView 信号的核心函数
     """
     try:
         # 1. 获取 JSON 数据
         # TradingView 发送的是 content-type: application/json
-        data = request.json
+        data = orjson.loads(await request.get_data(cache=False))
         
-        # 记录原始数据
-        logger.info("=" * 50)
-        logger.info(f"【收到新信号】: {data}")
+        # 记录原始数据（使用 % 参数延迟格式化，日志级别关闭时不会生成字符串）
+        logger.info("【收到新信号】: %s", data)
 
         # 2. 解析你在 TradingView 里定义的字段
         # 注意：这里的键名 (Key) 必须和你截图里 JSON 的键名完全一致
@@ -307,27 +474,9 @@ def webhook_listener():
         interval = data.get('interval')  # 这里会收到 "10"
         
         # 3. 准备发送到ATAS的信号数据
-        # 处理价格：如果是数字字符串或数字，转换为float；否则为None
-        price_value = None
-        if price and price != '未知价格':
-            try:
-                if isinstance(price, (int, float)):
-                    price_value = float(price)
-                elif isinstance(price, str):
-                    price_value = float(price)
-            except (ValueError, TypeError):
-                price_value = None
-        
-        # 处理周期：如果是数字字符串或数字，转换为int；否则为None
-        interval_value = None
-        if interval:
-            try:
-                if isinstance(interval, (int, float)):
-                    interval_value = int(interval)
-                elif isinstance(interval, str):
-                    interval_value = int(interval)
-            except (ValueError, TypeError):
-                interval_value = None
+        # 价格转换为float，周期转换为int；无法转换时为None
+        price_value = _to_num(price, float)
+        interval_value = _to_num(interval, int)
         
         # 应用品种映射
         mapped_ticker = map_ticker(ticker)
@@ -339,43 +488,42 @@ def webhook_listener():
             'Interval': interval_value
         }
         
+        # 重复推送的信号直接返回成功，不再广播
+        if _is_duplicate_signal(signal_data):
+            logger.info("重复信号已忽略: %s", signal_data)
+            return _SUCCESS_RESPONSE
+        
         # 4. 通过WebSocket广播信号到所有连接的ATAS客户端
         if WS_ENABLED:
-            # 直接调用异步广播函数（非阻塞）
-            broadcast_signal_async(signal_data)
+            # 与WebSocket服务器同一个事件循环，加入待广播列表（非阻塞）
+            await queue_signal(signal_data)
             # 减少日志输出频率，只在DEBUG模式下记录
-            logger.debug(f"信号已排队广播: {signal_data}")
+            logger.debug("信号已排队广播: %s", signal_data)
         else:
             logger.debug("WebSocket功能已禁用，信号未广播")
         
         # 5. 记录原始逻辑（保留原有日志）
         if action == 'buy':
-            logger.info(f"🚀 触发买入逻辑 -> 品种={ticker}, 周期={interval}分钟, 动作={action}, 价格: {price}")
+            logger.info("🚀 触发买入逻辑 -> 品种=%s, 周期=%s分钟, 动作=%s, 价格: %s", ticker, interval, action, price)
             
         elif action == 'sell':
-            logger.info(f"🔻 触发卖出逻辑 -> 品种={ticker}, 周期={interval}分钟, 动作={action}, 价格: {price}")
+            logger.info("🔻 触发卖出逻辑 -> 品种=%s, 周期=%s分钟, 动作=%s, 价格: %s", ticker, interval, action, price)
             
         else:
-            logger.warning(f"⚠️ 收到未知动作: {action}")
+            logger.warning("⚠️ 收到未知动作: %s", action)
 
         # 4. 必须返回 200 状态码，告诉 TradingView "我收到了"
-        return jsonify({"status": "success", "message": "Signal received"}), 200
+        return _SUCCESS_RESPONSE
 
     except Exception as e:
-        logger.error(f"❌ 处理信号时发生错误: {e}", exc_info=True)
-        return jsonify({"status": "error", "message": str(e)}), 400
+        logger.error("❌ 处理信号时发生错误: %s", e, exc_info=True)
+        return orjson.dumps({"status": "error", "message": str(e)}), 400, _JSON_HEADERS
 
 
 if __name__ == '__main__':
     # 加载品种映射配置
     load_ticker_mapping()
     
-    # 初始化广播事件循环
-    _init_broadcast_loop()
-    
-    # 启动WebSocket服务器
-    start_websocket_server()
-    
     # 获取服务器配置
     http_port = 8500
     
@@ -396,8 +544,10 @@ if __name__ == '__main__':
     logger.info(f"配置文件路径: {_config_file_path}")
     logger.info("=" * 60)
     
-    # 启动Flask HTTP服务器
-    # debug=True 允许你修改代码后自动重启，方便调试
-    # use_reloader=False 防止重载器导致WebSocket服务器重复启动（重载器会启动子进程导致端口冲突）
-    logger.info(f"Flask HTTP服务器启动在端口 {http_port}")
-    app.run(host='0.0.0.0', port=http_port, debug=True, use_reloader=False)
\ No newline at end of file
+    # 启动 uvicorn HTTP服务器（WebSocket服务器在 before_serving 中随之启动）
+    # loop='auto' 在已安装 uvloop 时自动使用（Windows 不支持 uvloop，回退到 asyncio）
+    # log_config=None 让 uvicorn 的日志沿用上面配置的文件/控制台输出
+    # 访问日志只在调试模式下输出，webhook 处理函数本身已记录每条信号
+    logger.info(f"uvicorn HTTP服务器启动在端口 {http_port}")
+    uvicorn.run(app, host='0.0.0.0', port=http_port, loop='auto', http='auto',
+                log_config=None, log_level='debug' if DEBUG else 'info', access_log=DEBUG)
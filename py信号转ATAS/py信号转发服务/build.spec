@@ -10,11 +10,22 @@ a = Analysis(
         ('ticker_mapping.txt', '.'),  # 包含配置文件
     ],
     hiddenimports=[
-        'flask',
+        'quart',
+        'uvicorn',
+        'uvicorn.logging',
+        'uvicorn.loops',
+        'uvicorn.loops.auto',
+        'uvicorn.protocols',
+        'uvicorn.protocols.http',
+        'uvicorn.protocols.http.auto',
+        'uvicorn.protocols.websockets',
+        'uvicorn.protocols.websockets.auto',
+        'uvicorn.lifespan',
+        'uvicorn.lifespan.on',
         'websockets',
+        'orjson',
         'asyncio',
         'json',
-        'threading',
         'logging',
     ],
     hookspath=[],